@@ -1,45 +1,179 @@
 import random
+import numpy as np
+
+# Coefficients are stored as int64 whenever they (and the modulus) stay well
+# inside the machine range; anything else falls back to Python integers.
+_INT64_BOUND = 2**62
+
+def int_coef(c):
+  i = int(c)
+  if i != c:
+    raise ValueError(f"Polynomial coefficients must be integers, got {c}")
+  return i
+
+def coef_array(coefs,intmod=None):
+  if isinstance(coefs,np.ndarray) and coefs.dtype.kind in "biu":
+    a = coefs
+  else:
+    # entries are checked one by one since NumPy would silently truncate
+    # non-integral values and turn integers beyond int64 into floats
+    a = np.array([int_coef(c) for c in coefs],dtype=object)
+  if intmod != None and intmod < _INT64_BOUND:
+    if a.size == 0 or (-_INT64_BOUND < a.min() and a.max() < _INT64_BOUND):
+      return a.astype(np.int64)
+  return a if a.dtype == object else a.astype(object)
+
+def product_fits(a,b):
+  if a.dtype == object or b.dtype == object or a.size == 0 or b.size == 0:
+    return False
+  return min(a.size,b.size) * int(np.abs(a).max()) * int(np.abs(b).max()) < 2**63
 
 def degree(p):
-  for i,c in enumerate(p.coefs[::-1]):
-    if c != 0:
-      return len(p.coefs)-i-1
-  return 0
+  return p._degree
+
+# Coefficients of several polynomials as the rows of a zero-padded matrix
+def stack_coefs(polys,width=None):
+  if width == None:
+    width = max(p.coefs.size for p in polys)
+  dtype = object if any(p.coefs.dtype == object for p in polys) else np.int64
+  m = np.zeros((len(polys),width),dtype=dtype)
+  for r, p in enumerate(polys):
+    m[r,:p.coefs.size] = p.coefs
+  return m
+
+# Shared instances of the constant polynomials 0 and 1, keyed by modulus
+_ZERO = {}
+_ONE = {}
 
 class Polynomial(object):
+
+  __slots__ = ("coefs","intmod","_degree","_lead","_repr")
   
   def __init__(self,coefs,intmod=None):
-    self.coefs = coefs
+    self._assign(coef_array(coefs,intmod),intmod)
+
+  # Fast constructor for arithmetic results: the coefficients already
+  # form an array reduced modulo intmod, so no conversion is needed
+  @staticmethod
+  def _from_reduced(coefs,intmod):
+    p = Polynomial.__new__(Polynomial)
+    if intmod == None or intmod >= _INT64_BOUND:
+      if coefs.dtype != object:
+        coefs = coefs.astype(object)
+    elif coefs.dtype == object:
+      coefs = coefs.astype(np.int64)
+    p._assign(coefs,intmod)
+    return p
+
+  def _assign(self,coefs,intmod):
+    # Trailing zeros are stripped so that the degree is len(coefs)-1
+    nz = np.flatnonzero(coefs)
+    self.coefs = coefs[:int(nz[-1])+1] if nz.size else np.zeros(1,dtype=coefs.dtype)
     self.intmod = intmod
+    # Polynomials are never modified in place, so the degree and the
+    # leading coefficient can be computed once (the coefficient buffer is
+    # made read-only to keep these cached values valid)
+    self.coefs.flags.writeable = False
+    self._degree = self.coefs.size-1
+    self._lead = int(self.coefs[-1])
+    self._repr = None
+
+  def lead_coef(self):
+    return self._lead
+
+  def is_null(self):
+    return self._lead == 0
 
+  def is_one(self):
+    return self._degree == 0 and self._lead == 1
+
+  @staticmethod
+  def zero(intmod=None):
+    if not(intmod in _ZERO):
+      _ZERO[intmod] = Polynomial([0],intmod)
+    return _ZERO[intmod]
+
+  @staticmethod
+  def one(intmod=None):
+    if not(intmod in _ONE):
+      _ONE[intmod] = Polynomial([1],intmod)
+    return _ONE[intmod]
+
+  # modulus under which self and other can be combined (None if they differ)
+  def shared_mod(self,other):
+    return self.intmod if self.intmod == other.intmod else None
+
+  # the string is built on first use only (ciphertexts are printed as
+  # arrays of polynomials, so the same polynomial is often formatted again)
   def __repr__(self):
-    return "+".join([f"[{c}]^{k}" for k,c in enumerate(self.coefs) if k <= degree(self) and c != 0][::-1])+f" ({self.intmod})"
+    if self._repr == None:
+      self._repr = "+".join([f"[{c}]^{k}" for k,c in enumerate(self.coefs.tolist()) if c != 0][::-1])+f" ({self.intmod})"
+    return self._repr
 
   def mod(self,intmod=None):
     if intmod == None:
-      return Polynomial(self.coefs,None)
+      return Polynomial._from_reduced(self.coefs,None)
     else:
-      return Polynomial([(x % intmod) for x in self.coefs],intmod)
+      # int64 coefficients cannot be reduced by moduli beyond the int64 range
+      coefs = self.coefs if intmod < _INT64_BOUND else self.coefs.astype(object)
+      return Polynomial(coefs % intmod,intmod)
 
   def __mul__(self,other):
-    mod = None if self.intmod != other.intmod else self.intmod
-    mod_coef = lambda x,y: (x * y) % mod if mod != None else x*y
-    d_self = degree(self)
-    d_other = degree(other)
-    coefs = [sum([(mod_coef(c,other.coefs[n-k]) if 0 <= n-k < len(other.coefs) else 0) for k,c in enumerate(self.coefs)]) for n in range(d_self+d_other+1)]
-    return Polynomial(coefs,mod)
+    mod = self.shared_mod(other)
+    if self.is_null() or other.is_null():
+      return Polynomial.zero(mod)
+    if self.is_one():
+      return other.mod(mod)
+    if other.is_one():
+      return self.mod(mod)
+    if np.count_nonzero(other.coefs) == 1:
+      return self.mul_monomial(degree(other),other.lead_coef(),mod)
+    if np.count_nonzero(self.coefs) == 1:
+      return other.mul_monomial(degree(self),self.lead_coef(),mod)
+    a = self.coefs
+    b = other.coefs
+    if not product_fits(a,b):
+      a = a.astype(object)
+      b = b.astype(object)
+    coefs = np.convolve(a,b)
+    if mod != None:
+      coefs %= mod
+    return Polynomial._from_reduced(coefs,mod)
+
+  # multiplication by c*X^k reduces to a scaling and a shift
+  def mul_monomial(self,k,c,mod):
+    a = self.coefs
+    if a.dtype == object or abs(c) * int(np.abs(a).max()) >= 2**63:
+      a = a.astype(object)
+    coefs = np.zeros(a.size+k,dtype=a.dtype)
+    coefs[k:] = a * c
+    if mod != None:
+      np.mod(coefs,mod,out=coefs)
+    return Polynomial._from_reduced(coefs,mod)
 
   def __add__(self,other):
-    mod = None if self.intmod != other.intmod else self.intmod
-    mod_coef = lambda x,y: (x + y) % mod if mod != None else x + y
-    d_self = degree(self)
-    d_other = degree(other)
-    coefs = [ mod_coef(self.coefs[k] if 0<=k<len(self.coefs) else 0, other.coefs[k] if 0 <=k<len(other.coefs) else 0) for k in range(max(d_self,d_other)+1)]
-    return Polynomial(coefs,mod)
+    mod = self.shared_mod(other)
+    if other.is_null():
+      return self.mod(mod)
+    if self.is_null():
+      return other.mod(mod)
+    a = self.coefs
+    b = other.coefs
+    if a.size < b.size:
+      a, b = b, a
+    if a.dtype != b.dtype or mod == None:
+      coefs = a.astype(object)
+      b = b.astype(object)
+    else:
+      coefs = a.copy()
+    coefs[:b.size] += b
+    if mod != None:
+      np.mod(coefs,mod,out=coefs)
+    return Polynomial._from_reduced(coefs,mod)
   
   def __lshift__(self,other):
     d_other = degree(other)
-    if other.coefs[d_other] != 1:
+    if other.lead_coef() != 1:
       print("Warning for Polynomial.__lshift__: polynomial modulus is not monic (no action taken)")
       return self, False
 
@@ -48,61 +182,98 @@ class Polynomial(object):
       return self, False
 
     deg_diff = d_self-d_other
-    a_d = self.coefs[d_self]
-    mod = None if self.intmod != other.intmod else self.intmod
-    mod_coef = lambda x,y: (x - a_d * y) % mod if mod != None else x - a_d * y
-    coefs = [(mod_coef(c,other.coefs[k-deg_diff]) if  0 <= k-deg_diff < len(other.coefs) else c) for k,c in enumerate(self.coefs)]
-    return Polynomial(coefs,mod), True
-
+    a_d = self.lead_coef()
+    mod = self.shared_mod(other)
+    b = other.coefs
+    coefs = self.coefs
+    if coefs.dtype == object or b.dtype == object or abs(a_d) * int(np.abs(b).max()) >= _INT64_BOUND:
+      coefs = coefs.astype(object)
+      b = b.astype(object)
+    else:
+      coefs = coefs.copy()
+    np.subtract(coefs[deg_diff:],a_d * b,out=coefs[deg_diff:])
+    if mod != None:
+      coefs %= mod
+    return Polynomial._from_reduced(coefs,mod), True
+
+  # Long division on a single remainder buffer; equivalent to applying
+  # __lshift__ until the degree drops below that of other
   def __mod__(self,other):
-    p, t = self << other
-    while t:
-      p, t = p << other
-    return p
+    d_other = degree(other)
+    if other.lead_coef() != 1 or degree(self) < d_other:
+      return (self << other)[0]
+
+    mod = self.shared_mod(other)
+    if mod != None and (mod-1) * mod < 2**63:
+      r = (self.coefs % mod).astype(np.int64)
+      b = (other.coefs % mod).astype(np.int64)
+    else:
+      r = self.coefs.astype(object)
+      b = other.coefs.astype(object)
+      if mod != None:
+        r %= mod
+        b %= mod
+    for i in range(degree(self),d_other-1,-1):
+      q = r[i]
+      if q != 0:
+        r[i-d_other:i+1] -= q * b
+        if mod != None:
+          r[i-d_other:i+1] %= mod
+    return Polynomial._from_reduced(r[:d_other],mod)
 
   @staticmethod
-  def random(intmod,dim,anchor = lambda v,w : random.randrange(w)):
-    return Polynomial([anchor(i,intmod) for i in range(dim)],intmod)
+  def random(intmod,dim,anchor = None):
+    if anchor != None:
+      return Polynomial([anchor(i,intmod) for i in range(dim)],intmod)
+    return Polynomial.random_batch(intmod,dim,1)[0]
+
+  @staticmethod
+  def random_batch(intmod,dim,n):
+    if intmod < _INT64_BOUND:
+      # the generator is seeded from the random module so that random.seed
+      # still makes keys and ciphertexts repeatable
+      rng = np.random.default_rng(random.getrandbits(128))
+      rows = rng.integers(0,intmod,size=(n,dim),dtype=np.int64)
+      return [Polynomial._from_reduced(row,intmod) for row in rows]
+    return [Polynomial([random.randrange(intmod) for _ in range(dim)],intmod) for _ in range(n)]
 
   @staticmethod
   def randshift(coef,intmod,dim):
-    degree_shift = [0]*(random.randrange(dim))
-    return Polynomial(degree_shift + [coef % intmod],intmod)
+    coefs = np.zeros(random.randrange(dim)+1,dtype=np.int64 if intmod < _INT64_BOUND else object)
+    coefs[-1] = coef % intmod
+    return Polynomial._from_reduced(coefs,intmod)
 
+  # arg may also be an array of points, evaluated together in one sweep
   def __call__(self,arg=1):
     output = 0
-    for i, c in enumerate(self.coefs):
+    if isinstance(arg,np.ndarray):
+      arg = arg.astype(object)
+      output = np.zeros(arg.shape,dtype=object)
+    for c in self.coefs[::-1].tolist():
       output = (output*arg+c) % self.intmod if self.intmod != None else output*arg+c
-      if i == degree(self):
-        return output
-    return None
+    return output
 
 import math
 from functools import reduce
 
 def extended_gcd(a, b):
-    r = [a,b]
-    s = [1,0]
-    t = [0,1]
-    while not(0 in r):
-      r1 = r[-1]
-      r0 = r[-2]
+    r0, r1 = a, b
+    s0, s1 = 1, 0
+    t0, t1 = 0, 1
+    while r0 != 0 and r1 != 0:
       q, r2 = divmod(r0,r1)
-      r.append(r2)
-      s.append(s[-2]-q*s[-1])
-      t.append(t[-2]-q*t[-1]) 
-    return (r[-2],s[-2],t[-2])
+      r0, r1 = r1, r2
+      s0, s1 = s1, s0-q*s1
+      t0, t1 = t1, t0-q*t1
+    return (r0,s0,t0)
 
 def randinverse(intmod):
   a = random.randrange(1,intmod)
   while math.gcd(a,intmod) != 1:
     a = random.randrange(1,intmod)
-  _, inva, k = extended_gcd(a,intmod)
-  return (a,inva % intmod)
+  return (a,pow(a,-1,intmod))
 
 
-import numpy as np
-
 class RandIso(object):
 
   def __init__(self,intmod,dim):
@@ -114,52 +285,54 @@ class RandIso(object):
     j = random.choice([k for k in range(self.dim) if k!=i])
     return i,j
 
+  # identity matrix whose entries can hold residues modulo intmod
+  # (object dtype unless products of such matrices fit in int64)
+  def identity(self):
+    fits = self.dim * (self.intmod-1)**2 < 2**63
+    return np.eye(self.dim, dtype=(np.int64 if fits else object))
+
   def generate_swap(self):
     i,j = self.generate_pair()
-    m = []
-    for r in range(self.dim):
-      if r == i:
-        m.append([(1 if s==j else 0) for s in range(self.dim)])
-      elif r == j:
-        m.append([(1 if s==i else 0) for s in range(self.dim)])
-      else:
-        m.append([(1 if s==r else 0) for s in range(self.dim)])
-    return np.array(m)
+    m = self.identity()
+    m[[i,j]] = m[[j,i]]
+    return m
         
   def generate_mult(self):
-    m = []
-    invm = []
-    for r in range(self.dim):
-      a,inva = randinverse(self.intmod)
-      m.append([(a if s==r else 0) for s in range(self.dim)])
-      invm.append([(inva if s==r else 0) for s in range(self.dim)])
-    return np.array(m), np.array(invm)
+    a, inva = zip(*[randinverse(self.intmod) for _ in range(self.dim)])
+    m = self.identity()
+    invm = self.identity()
+    m[np.diag_indices(self.dim)] = a
+    invm[np.diag_indices(self.dim)] = inva
+    return m, invm
 
   def generate_line(self):
     i,j = self.generate_pair()
-    m = []
-    invm = []
     a = random.randrange(1,self.intmod)
-    for r in range(self.dim):
-      m.append([(1 if s==r else ( a if r==i and s==j else 0)) for s in range(self.dim)])
-      invm.append([(1 if s==r else ( self.intmod-a if r==i and s==j else 0)) for s in range(self.dim)])
-    return np.array(m), np.array(invm)
+    m = self.identity()
+    invm = self.identity()
+    m[i,j] = a
+    invm[i,j] = self.intmod-a
+    return m, invm
 
   def generate(self,length,pswap=1,pmult=2,pline=3):
-    u = np.eye(self.dim, dtype=int)
-    invu = np.eye(self.dim, dtype=int)
+    u = self.identity()
+    invu = self.identity()
+    # products are written into a reused buffer and reduced back into u, invu
+    tmp = self.identity()
     choices = ["swap"] * pswap + ["mult"] * pmult + ["line"] * pline
-    for i in range(length):
-      x = random.choice(choices)
+    # the whole sequence of operations is drawn at once
+    for x in random.choices(choices,k=length):
       if x == "swap":
         m = invm = self.generate_swap()
-      if x == "mult":
+      elif x == "mult":
         m , invm = self.generate_mult()
-      if x == "line":
+      else:
         m , invm = self.generate_line()
-      u = (m @ u) % self.intmod
-      invu = (invu @ invm) % self.intmod
-    return (u % self.intmod), (invu % self.intmod)
+      np.matmul(m,u,out=tmp)
+      np.mod(tmp,self.intmod,out=u)
+      np.matmul(invu,invm,out=tmp)
+      np.mod(tmp,self.intmod,out=invu)
+    return u, invu
 
 class ArithChannel(object):
 
@@ -189,34 +362,37 @@ class ArithChannel(object):
   def generate_vanisher(self,anchor = lambda v : 0 if random.uniform(0,1) < 0.5 else 1):
     e = []
     lvl_e = []
+    randpolys = Polynomial.random_batch(self.intmod,self.dim,self.N)
     for i in range(self.N):
       k = anchor(i)
       lvl_e.append(k)
-      randpoly = Polynomial.random(self.intmod,self.dim)
+      randpoly = randpolys[i]
       shift = Polynomial.randshift(self.vanmod * k - randpoly(arg=1),self.intmod,self.dim)
       e.append(shift + randpoly)
     return e, lvl_e
 
   def generate_initializer(self):
     f0 = []
+    randpolys = iter(Polynomial.random_batch(self.intmod,self.dim,self.N * self.dim))
     # divisor of self.intmod
     for _ in range(self.N):
       row = []
       for _ in range(self.dim):
         k = random.randrange(self.intmod)
-        randpoly = Polynomial.random(self.intmod,self.dim)
+        randpoly = next(randpolys)
         shift = Polynomial.randshift(self.vanmod * k - randpoly(arg=1),self.intmod,self.dim)
         row.append(shift + randpoly)
       f0.append(row)
     return f0
 
   def generate_noisy_key(self,anchor = lambda v : 0 if random.uniform(0,1) < 0.5 else 1):
-    f1 = [Polynomial([0],self.intmod) for _ in range(self.N)]
+    f1 = [Polynomial.zero(self.intmod) for _ in range(self.N)]
     e, lvl_e = self.generate_vanisher(anchor = anchor)
     for i in range(self.N):
       for j in range(self.dim):
-        f1[i] = (f1[i] + self.f0[i][j] * self.x[j]) % self.u
-      f1[i] = f1[i] + e[i]
+        f1[i] = f1[i] + self.f0[i][j] * self.x[j]
+      # reducing modulo u is linear, so it is done once per row
+      f1[i] = f1[i] % self.u + e[i]
     return f1, lvl_e
     
   def publish(self,fhe = False):
@@ -266,24 +442,24 @@ class ArithChannel(object):
     for k in range(len(m)):
       x.append(Polynomial(list(m_t[k]),self.intmod))
 
-    tensor = []
-    # we will have a list/array: tensor[i][j][k]
+    # we will have an array: tensor[i][j][k]
+    tensor = np.zeros((len(x),len(x),self.dim),dtype=x[0].coefs.dtype)
     for i in range(len(x)):
-      row = []
-      for j in range(len(x)):
+      # x[i]*x[j] = x[j]*x[i], so the lower half mirrors the upper half
+      for j in range(i,len(x)):
         xi_xj_mod_u = (x[i] * x[j]) % poly_u
         a_ij_poly = xi_xj_mod_u.mod(self.intmod)
 
-        if sum(a_ij_poly.coefs[self.dim:]) != 0:
+        if any(a_ij_poly.coefs[self.dim:]):
           print("Error in ArithChannel.generate_secret: tensor cannot be computed due to dimension discrepancies")
           print(a_ij_poly)
           exit()
 
-        a_ij = np.array(a_ij_poly.coefs[:self.dim] + [0] * (self.dim - len(a_ij_poly.coefs)) )
-        row.append((invm @ a_ij) % self.intmod)
-      tensor.append(np.array(row))
+        a_ij = np.zeros(self.dim,dtype=a_ij_poly.coefs.dtype)
+        a_ij[:min(self.dim,a_ij_poly.coefs.size)] = a_ij_poly.coefs[:self.dim]
+        tensor[i,j] = tensor[j,i] = (invm @ a_ij) % self.intmod
     
-    return x, np.array(tensor)
+    return x, tensor
 
 
 class ACESCipher(object):
@@ -305,33 +481,75 @@ class ACES(object):
     self.dim = dim
     self.N = N
     self.u = u
+    self.maps = self.generate_linear_maps()
+    self.maps_object = self.maps.astype(object)
+    self.maps_bound = N * dim * int(np.abs(self.maps).max())
 
   def encrypt(self,m,anchor = lambda v,w: random.randint(0,w)):
-    if m >= self.vanmod:
-      print(f"Warning in ACES.encrypt: the input is equivalent to {m % self.vanmod}")
-    b = self.generate_linear(anchor=anchor)
-    enc = self.generate_error(m)
-    for i in range(self.N):
-      enc = enc + (b[i] * self.f1[i]) % self.u
-    dec = []
-    for j in range(self.dim):
-      dec_j = Polynomial([0],self.intmod)
-      for i in range(self.N):
-        dec_j = dec_j + (b[i] * self.f0[i][j]) % self.u
-      dec.append(dec_j)
-    return ACESCipher(dec,enc,self.N * self.vanmod) , [b[i](arg=1) for i in range(self.N)]
-
-  def generate_linear(self,anchor = lambda v,w: random.randint(0,w)):
+    return self.encrypt_batch([m],anchor=anchor)[0]
+
+  # Multiplying a polynomial b of degree < dim by a fixed f and reducing
+  # modulo u is a linear map on the coefficients of b. The maps of all the
+  # f0[i][j] and f1[i] are stacked into one (N*dim, (dim+1)*dim) matrix so
+  # that encrypt_batch computes all the ciphertexts with one matrix product.
+  def generate_linear_maps(self):
+    q = self.intmod
+    dtype = np.int64 if self.dim * (q-1)**2 < 2**63 else object
+    # column k of the maps is X^k*f mod u, obtained from X^(k-1)*f mod u
+    # through the companion matrix of u
+    companion = np.zeros((self.dim,self.dim),dtype=dtype)
+    companion[np.arange(1,self.dim),np.arange(self.dim-1)] = 1
+    companion[:,-1] = (-self.u.coefs[:self.dim].astype(dtype)) % q
+    polys = [f % self.u for i in range(self.N) for f in list(self.f0[i]) + [self.f1[i]]]
+    g = stack_coefs(polys,width=self.dim).astype(dtype) % q
+    maps = np.zeros((self.dim,) + g.shape,dtype=dtype)
+    for k in range(self.dim):
+      maps[k] = g
+      g = (g @ companion.T) % q
+    # maps[k,(i,o),l] moves to row (i,k) and column (o,l)
+    maps = maps.reshape(self.dim,self.N,self.dim+1,self.dim).transpose(1,0,2,3)
+    return maps.reshape(self.N * self.dim,(self.dim+1) * self.dim)
+
+  # encrypts several messages at once: the random polynomials are drawn in
+  # one batch and the products with the public key in one matrix product
+  def encrypt_batch(self,messages,anchor = lambda v,w: random.randint(0,w)):
+    n = len(messages)
+    if n == 0:
+      return []
+    randpolys = Polynomial.random_batch(self.intmod,self.dim,n * (self.N+1))
+    b = []
+    for t, m in enumerate(messages):
+      if m >= self.vanmod:
+        print(f"Warning in ACES.encrypt: the input is equivalent to {m % self.vanmod}")
+      b.append(self.generate_linear(anchor=anchor,randpolys=randpolys[t*(self.N+1):t*(self.N+1)+self.N]))
+    coefs = stack_coefs([p for bt in b for p in bt],width=self.dim).reshape(n,self.N * self.dim)
+    maps = self.maps
+    if coefs.dtype == object or maps.dtype == object or self.maps_bound * int(np.abs(coefs).max()) >= 2**63:
+      coefs = coefs.astype(object)
+      maps = self.maps_object
+    # row t holds dec_0, ..., dec_{dim-1} and the linear part of enc
+    out = ((coefs @ maps) % self.intmod).reshape(n,self.dim+1,self.dim)
+    output = []
+    for t, m in enumerate(messages):
+      dec = [Polynomial._from_reduced(out[t,j],self.intmod) for j in range(self.dim)]
+      enc = self.generate_error(m,randpoly=randpolys[t*(self.N+1)+self.N]) + Polynomial._from_reduced(out[t,self.dim],self.intmod)
+      output.append((ACESCipher(dec,enc,self.N * self.vanmod) , [b[t][i](arg=1) for i in range(self.N)]))
+    return output
+
+  def generate_linear(self,anchor = lambda v,w: random.randint(0,w),randpolys = None):
     b = []
+    if randpolys == None:
+      randpolys = Polynomial.random_batch(self.intmod,self.dim,self.N)
     for i in range(self.N):
       k = anchor(i,self.vanmod)
-      randpoly = Polynomial.random(self.intmod,self.dim)
+      randpoly = randpolys[i]
       shift = Polynomial.randshift(k - randpoly(arg=1),self.intmod,self.dim)
       b.append(shift + randpoly)
     return b
 
-  def generate_error(self,m):
-    randpoly = Polynomial.random(self.intmod,self.dim)
+  def generate_error(self,m,randpoly = None):
+    if randpoly == None:
+      randpoly = Polynomial.random(self.intmod,self.dim)
     shift = Polynomial.randshift(m - randpoly(arg=1),self.intmod,self.dim)
     return shift + randpoly
 
@@ -347,7 +565,7 @@ class ACESReader(object):
     self.u = ac.u
 
   def decrypt(self,c):
-    cTx = Polynomial([0],self.intmod)
+    cTx = Polynomial.zero(self.intmod)
     for i in range(self.dim):
       cTx = cTx + c.dec[i] * self.x[i]
     
@@ -356,7 +574,7 @@ class ACESReader(object):
 
 
 
-from pyaces.compaces import read_operations
+from pyaces.compaces import compile_operations
 
 class ACESAlgebra(object):
 
@@ -366,6 +584,11 @@ class ACESAlgebra(object):
     self.dim = dim
     self.u = u
     self.tensor = tensor
+    # the tensor is only used as a (dim, dim**2) matrix in mult; it is
+    # reshaped once, together with the bound used for the overflow check
+    self.lam = np.asarray(tensor).reshape(dim * dim,dim).T
+    self.lam_object = self.lam.astype(object)
+    self.lam_bound = dim * dim * int(np.abs(self.lam).max())
 
   def add(self,a,b):
     c0 = [ (a.dec[k]+b.dec[k]) % self.u for k in range(self.dim) ]
@@ -373,13 +596,15 @@ class ACESAlgebra(object):
     return ACESCipher(c0, c1, a.uplvl + b.uplvl)
   
   def mult(self,a,b):
-    t = []
-    for k in range(self.dim):
-      tmp = Polynomial([0],self.intmod)
-      for i in range(self.dim):
-        for j in range(self.dim):
-          tmp = tmp + Polynomial([self.tensor[i][j][k]],self.intmod) * a.dec[i] * b.dec[j]
-      t.append(tmp)
+    # t[k] = sum_{i,j} tensor[i][j][k] * a.dec[i] * b.dec[j], computed as one
+    # matrix product between the tensor and the coefficients of the dim**2
+    # products a.dec[i] * b.dec[j]
+    prods = stack_coefs([a.dec[i] * b.dec[j] for i in range(self.dim) for j in range(self.dim)])
+    lam = self.lam
+    if prods.dtype == object or lam.dtype == object or self.lam_bound * int(np.abs(prods).max()) >= 2**63:
+      prods = prods.astype(object)
+      lam = self.lam_object
+    t = [Polynomial._from_reduced(row,self.intmod) for row in (lam @ prods) % self.intmod]
 
     c0 = [ ( b.enc * a.dec[k] +a.enc * b.dec[k] + Polynomial([-1],self.intmod) * t[k]) % self.u for k in range(self.dim) ]
     c1 = ( a.enc * b.enc ) % self.u
@@ -389,7 +614,7 @@ class ACESAlgebra(object):
     return ACESCipher(c.dec, c.enc + Polynomial([- k * self.vanmod],self.intmod) , c.uplvl-k)
 
   def compile(self,instruction):
-    return lambda a: read_operations(self,instruction,a)
+    return compile_operations(self,instruction)
 
 
 class ACESRefresher(object):
@@ -409,5 +634,5 @@ class ACESRefresher(object):
     return a*b*self.vanmod
 
   def compile(self,instruction):
-    return lambda a: read_operations(self,instruction,a)
+    return compile_operations(self,instruction)
 
@@ -1,9 +1,15 @@
-# applies algebraic operation (specified on indices) to the array
-def read_operations(alg,instruction,array,level=0):
-  # print(level,instruction)
+from functools import lru_cache
+
+# parses an algebraic expression on indices into a tree whose leaves are indices
+# and whose nodes are triples (symbol,left,right)
+# (trees are immutable tuples, so the most recent instructions are cached)
+@lru_cache(maxsize=128)
+def parse_operations(instruction,level=0):
+  return _parse_operations(instruction,level)
+
+def _parse_operations(instruction,level=0):
   if all([not(a in instruction) for a in ["+","*","(",")"," "] ]):
-    # print("cal",array[int(instruction)])
-    return array[int(instruction)]
+    return int(instruction)
   else:
     output = {}
     parser = level
@@ -16,7 +22,6 @@ def read_operations(alg,instruction,array,level=0):
       elif s == ")":
         parser -=1
     pos = [[i,s] for i,[s,p] in output.items() if p == level]
-    # print(pos)
     if pos == []:
       output = {}
       parser = level
@@ -29,17 +34,35 @@ def read_operations(alg,instruction,array,level=0):
         elif s == ")":
           parser -=1
       pos = [[i,s] for i,[s,p] in output.items() if p == level]
-      # print(pos)
       if pos == []:
-        return read_operations(alg,inst[1:-1],array,level=level+1)
+        return _parse_operations(inst[1:-1],level=level+1)
       else:
         index, symbol = pos[0]
         if symbol == "*":
-          return alg.mult(read_operations(alg,inst[:index],array,level=level),read_operations(alg,inst[index+1:],array,level=level))
+          return (symbol,_parse_operations(inst[:index],level=level),_parse_operations(inst[index+1:],level=level))
     else:
       index, symbol = pos[0]
       if symbol == "+":
-        return alg.add(read_operations(alg,inst[:index],array,level=level),read_operations(alg,inst[index+1:],array,level=level))
+        return (symbol,_parse_operations(inst[:index],level=level),_parse_operations(inst[index+1:],level=level))
+
+# applies a parsed algebraic operation (see parse_operations) to the array
+def run_operations(alg,tree,array):
+  if isinstance(tree,int):
+    return array[tree]
+  symbol, left, right = tree
+  if symbol == "+":
+    return alg.add(run_operations(alg,left,array),run_operations(alg,right,array))
+  else:
+    return alg.mult(run_operations(alg,left,array),run_operations(alg,right,array))
+
+# applies algebraic operation (specified on indices) to the array
+def read_operations(alg,instruction,array,level=0):
+  return run_operations(alg,parse_operations(instruction,level),array)
+
+# parses the instruction once and returns a function that only evaluates it
+def compile_operations(alg,instruction):
+  tree = parse_operations(instruction)
+  return lambda a: run_operations(alg,tree,a)
 
 
 class Algebra(object):
@@ -53,4 +76,4 @@ class Algebra(object):
     return a*b
 
   def compile(self,instruction):
-    return lambda a: read_operations(self,instruction,a) 
+    return compile_operations(self,instruction)
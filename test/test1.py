@@ -4,7 +4,7 @@ ac = ArithChannel(32,32**5+1,10,2)
 (f0,f1,vanmod,intmod,dim,N,u,tensor) = ac.publish(fhe = True)
 
 print(u)
-print(sum(u.coefs)-intmod)
+print(int(sum(u.coefs))-intmod)
 
 q_p = intmod/vanmod
 print(q_p)
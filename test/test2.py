@@ -11,7 +11,7 @@ q_p = intmod/vanmod
 
 import random as rd
 array = [rd.randint(0,5) for _ in range(8)]
-enc_array = [bob.encrypt(a) for a in array]
+enc_array = bob.encrypt_batch(array)
 send_array, keep_array = map(list,zip(*enc_array))
 print(array)
 print(send_array)
@@ -0,0 +1,94 @@
+from pyaces import *
+import random as rd
+import numpy as np
+
+# plain-int list arithmetic used as a reference for Polynomial
+
+def trim(c):
+  c = list(c)
+  while len(c) > 1 and c[-1] == 0:
+    c.pop()
+  return c if c != [] else [0]
+
+def coefs(p):
+  return trim([int(c) for c in p.coefs])
+
+def ref_add(a,b,q):
+  n = max(len(a),len(b))
+  a = a + [0]*(n-len(a))
+  b = b + [0]*(n-len(b))
+  return trim([(x+y) % q for x,y in zip(a,b)])
+
+def ref_mul(a,b,q):
+  c = [0]*(len(a)+len(b)-1)
+  for i,x in enumerate(a):
+    for j,y in enumerate(b):
+      c[i+j] += x*y
+  return trim([x % q for x in c])
+
+# b is monic; like Polynomial.__mod__, a is returned as is when its degree
+# is already below that of b
+def ref_mod(a,b,q):
+  if len(trim(a)) < len(b):
+    return trim(a)
+  r = [x % q for x in trim(a)]
+  d = len(b)-1
+  for i in range(len(r)-1,d-1,-1):
+    c = r[i]
+    for j in range(d+1):
+      r[i-d+j] = (r[i-d+j] - c*b[j]) % q
+  return trim(r[:d])
+
+def ref_lshift(a,b,q):
+  a = trim(a)
+  d = len(a)-len(b)
+  if d < 0:
+    return a, False
+  r = list(a)
+  for j in range(len(b)):
+    r[d+j] -= a[-1]*b[j]
+  return trim([x % q for x in r]), True
+
+def ref_eval(a,x,q):
+  return sum([c * pow(x,k,q) for k,c in enumerate(a)]) % q
+
+# moduli on both sides of 2**62 (int64 storage bound) and 2**63
+for q in [97, 2**31-1, 2**62-57, 2**62+135, 2**63-25, 2**63+29, 2**70+3]:
+  for _ in range(50):
+    a = [rd.randrange(-q,q) for _ in range(rd.randint(1,12))] + [0]*rd.randint(0,2)
+    b = [rd.randrange(-q,q) for _ in range(rd.randint(1,12))]
+    m = [rd.randrange(q) for _ in range(rd.randint(1,6))] + [1]
+    pa = Polynomial(a,q)
+    pb = Polynomial(b,q)
+    pm = Polynomial(m,q)
+    assert coefs(pa+pb) == ref_add(a,b,q)
+    assert coefs(pa*pb) == ref_mul(a,b,q)
+    assert coefs(pa*Polynomial([0,0,b[0]],q)) == ref_mul(a,[0,0,b[0]],q)
+    assert coefs(pa % pm) == ref_mod(a,m,q)
+    r, t = pa << pm
+    rr, rt = ref_lshift(a,m,q)
+    assert t == rt and coefs(r) == rr
+    for q2 in [101, 2**62+135, 2**64+13]:
+      assert coefs(pa.mod(q2)) == trim([x % q2 for x in a])
+    x = rd.randrange(q)
+    assert pa(arg=x) == ref_eval(a,x,q)
+    xs = np.array([rd.randrange(q) for _ in range(3)],dtype=object)
+    assert list(pa(arg=xs)) == [ref_eval(a,int(y),q) for y in xs]
+  print(q, "ok")
+
+# full round trip with a modulus beyond the int64 storage bound
+ac = ArithChannel(32,2**70+3,10,2)
+(f0,f1,vanmod,intmod,dim,N,u,tensor) = ac.publish(fhe = True)
+bob = ACES(f0,f1,vanmod,intmod,dim,N,u)
+alice = ACESReader(ac)
+alg = ACESAlgebra(vanmod,intmod,dim,u,tensor)
+
+array = [rd.randrange(32) for _ in range(4)]
+send_array = [c for c, _ in bob.encrypt_batch(array)]
+print(array)
+print([alice.decrypt(c) for c in send_array])
+assert [alice.decrypt(c) for c in send_array] == array
+print(alice.decrypt(alg.add(send_array[0],send_array[1])), (array[0]+array[1]) % 32)
+assert alice.decrypt(alg.add(send_array[0],send_array[1])) == (array[0]+array[1]) % 32
+print(alice.decrypt(alg.mult(send_array[2],send_array[3])), (array[2]*array[3]) % 32)
+assert alice.decrypt(alg.mult(send_array[2],send_array[3])) == (array[2]*array[3]) % 32